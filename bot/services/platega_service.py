@@ -1,13 +1,18 @@
 import asyncio
+import base64
+import functools
 import hashlib
 import hmac
 import json
 import logging
-from datetime import datetime
-from decimal import Decimal, ROUND_HALF_UP
-from typing import Optional, Dict, Any, Tuple
-
-from aiohttp import ClientSession, ClientTimeout, web
+import math
+import struct
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from typing import Optional, Dict, Any, Mapping, Set, Tuple
+
+from aiohttp import ClientSession, ClientTimeout, ContentTypeError, TCPConnector, web
 from aiogram import Bot
 from sqlalchemy.orm import sessionmaker
 
@@ -20,6 +25,32 @@ from bot.services.notification_service import NotificationService
 from db.dal import payment_dal, user_dal
 from bot.utils.text_sanitizer import sanitize_display_name, username_for_display
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _json_loads(raw: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Opaque payment payload: packed (user_id, months, payment_db_id) + truncated HMAC tag.
+_PAYLOAD_STRUCT = struct.Struct("<QIQ")
+_PAYLOAD_TAG_LEN = 12
+# How many finalized transaction ids to remember for dropping provider retries.
+_RECENT_TX_LIMIT = 1024
+
 
 class PlategaService:
     def __init__(
@@ -38,26 +69,81 @@ class PlategaService:
         self.async_session_factory = async_session_factory
         self.subscription_service = subscription_service
         self.referral_service = referral_service
+        self._notifier = NotificationService(bot, settings, i18n)
 
         self.merchant_id: Optional[str] = settings.PLATEGA_MERCHANT_ID
         self.secret_key: Optional[str] = settings.PLATEGA_SECRET_KEY
         self.default_currency: str = (settings.DEFAULT_CURRENCY_SYMBOL or "RUB").upper()
 
         self.api_base_url: str = "https://app.platega.io"
+        self._create_url: str = f"{self.api_base_url}/transaction/process"
+        self._status_url_prefix: str = f"{self.api_base_url}/transaction/"
+        # Static part of the create-transaction request; dynamic fields are filled per call
+        self._payload_template: Dict[str, Any] = {
+            "paymentMethod": 2,  # Default to SBP (2)
+            "return": "https://t.me/pipun_bot",  # Return URL after successful payment
+            "failedUrl": "https://t.me/pipun_bot",  # URL for failed payment
+        }
         self._timeout = ClientTimeout(total=45)
         self._session: Optional[ClientSession] = None
+        self._recent_tx: "OrderedDict[str, None]" = OrderedDict()
+        self._today_cache: Tuple[int, str] = (-1, "")
+        self._pending: Set[asyncio.Task] = set()
 
         self.configured: bool = bool(
             settings.PLATEGA_ENABLED and self.merchant_id and self.secret_key
         )
         if not self.configured:
-            logging.warning("PlategaService initialized but not fully configured. Payments disabled.")
+            logger.warning("PlategaService initialized but not fully configured. Payments disabled.")
+
+        # Credentials are constant for the service lifetime; prepare them once.
+        self._merchant_id_b: bytes = (self.merchant_id or "").encode()
+        self._secret_key_b: bytes = (self.secret_key or "").encode()
+        self._auth_headers_get: Dict[str, str] = {
+            "X-MerchantId": self.merchant_id or "",
+            "X-Secret": self.secret_key or "",
+        }
+        self._auth_headers_post: Dict[str, str] = {
+            **self._auth_headers_get,
+            "Content-Type": "application/json",
+        }
+
+    @staticmethod
+    def _to_cents(amount: Any) -> int:
+        """Convert a monetary amount (number or numeric string) to integer cents, rounding half up."""
+        value = float(amount)
+        # round() to 6 places absorbs float representation error (1.005 * 100 == 100.4999...)
+        # so the result matches Decimal(str(value)).quantize(Decimal("0.01"), ROUND_HALF_UP).
+        cents = math.floor(round(abs(value) * 100, 6) + 0.5)
+        return -cents if value < 0 else cents
 
     @staticmethod
     def _format_amount(amount: float) -> str:
         """Format amount with two decimal places."""
-        quantized = Decimal(str(amount)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-        return f"{quantized:.2f}"
+        cents = PlategaService._to_cents(amount)
+        sign = "-" if cents < 0 else ""
+        whole, frac = divmod(abs(cents), 100)
+        return f"{sign}{whole}.{frac:02d}"
+
+    def _encode_payload(self, user_id: int, months: int, payment_db_id: int) -> str:
+        """Pack payment identifiers into a signed, URL-safe token."""
+        body = _PAYLOAD_STRUCT.pack(user_id, months, payment_db_id)
+        tag = hmac.new(self._secret_key_b, body, hashlib.sha256).digest()[:_PAYLOAD_TAG_LEN]
+        return base64.urlsafe_b64encode(body + tag).rstrip(b"=").decode("ascii")
+
+    def _decode_payload(self, token: str) -> Optional[Tuple[int, int, int]]:
+        """Verify a token from `_encode_payload`; returns (user_id, months, payment_db_id) or None."""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        except (ValueError, TypeError):
+            return None
+        if len(raw) != _PAYLOAD_STRUCT.size + _PAYLOAD_TAG_LEN:
+            return None
+        body, tag = raw[:_PAYLOAD_STRUCT.size], raw[_PAYLOAD_STRUCT.size:]
+        expected = hmac.new(self._secret_key_b, body, hashlib.sha256).digest()[:_PAYLOAD_TAG_LEN]
+        if not hmac.compare_digest(tag, expected):
+            return None
+        return _PAYLOAD_STRUCT.unpack(body)
 
     async def create_payment(
         self,
@@ -74,7 +160,7 @@ class PlategaService:
         Returns (success, response_data)
         """
         if not self.configured:
-            logging.error("PlategaService is not configured. Cannot create payment.")
+            logger.error("PlategaService is not configured. Cannot create payment.")
             return False, {"message": "service_not_configured"}
 
         currency_code = (currency or self.default_currency or "RUB").upper()
@@ -89,37 +175,32 @@ class PlategaService:
             description = f"Подписка на {months} мес."
         
         payload: Dict[str, Any] = {
-            "paymentMethod": payment_method or 2,  # Default to SBP (2)
+            **self._payload_template,
             "paymentDetails": {
                 "amount": amount_int,
                 "currency": currency_code,
             },
             "description": description,
-            "payload": f"user_id:{user_id};months:{months};payment_db_id:{payment_db_id}",
-            "return": "https://t.me/pipun_bot",  # Return URL after successful payment
-            "failedUrl": "https://t.me/pipun_bot",  # URL for failed payment
+            "payload": self._encode_payload(user_id, months, payment_db_id),
         }
+        if payment_method:
+            payload["paymentMethod"] = payment_method
 
         session = await self._get_session()
-        url = f"{self.api_base_url}/transaction/process"
-
-        headers = {
-            "X-MerchantId": self.merchant_id,
-            "X-Secret": self.secret_key,
-            "Content-Type": "application/json",
-        }
+        url = self._create_url
+        headers = self._auth_headers_post
 
         try:
-            async with session.post(url, json=payload, headers=headers) as response:
-                response_text = await response.text()
+            async with session.post(url, data=_json_dumps(payload), headers=headers) as response:
                 try:
-                    response_data = json.loads(response_text) if response_text else {}
-                except json.JSONDecodeError:
-                    logging.error("Platega create_payment: failed to decode JSON: %s", response_text)
-                    return False, {"status": response.status, "message": "invalid_json", "raw": response_text}
+                    response_data = await response.json(loads=_json_loads, content_type=None) or {}
+                except (json.JSONDecodeError, ContentTypeError):
+                    raw = (await response.read())[:512].decode("utf-8", "replace")
+                    logger.error("Platega create_payment: failed to decode JSON: %s", raw)
+                    return False, {"status": response.status, "message": "invalid_json", "raw": raw}
 
                 if response.status not in (200, 201):
-                    logging.error(
+                    logger.error(
                         "Platega create_payment: API returned error (status=%s, body=%s)",
                         response.status,
                         response_data,
@@ -128,7 +209,7 @@ class PlategaService:
 
                 return True, response_data
         except Exception as exc:
-            logging.error("Platega create_payment: request failed: %s", exc, exc_info=True)
+            logger.error("Platega create_payment: request failed: %s", exc, exc_info=True)
             return False, {"message": str(exc)}
 
     async def check_payment_status(self, transaction_id: str) -> Tuple[bool, Dict[str, Any]]:
@@ -137,28 +218,24 @@ class PlategaService:
         Returns (success, response_data)
         """
         if not self.configured:
-            logging.error("PlategaService is not configured. Cannot check status.")
+            logger.error("PlategaService is not configured. Cannot check status.")
             return False, {"message": "service_not_configured"}
 
         session = await self._get_session()
-        url = f"{self.api_base_url}/transaction/{transaction_id}"
-
-        headers = {
-            "X-MerchantId": self.merchant_id,
-            "X-Secret": self.secret_key,
-        }
+        url = self._status_url_prefix + str(transaction_id)
+        headers = self._auth_headers_get
 
         try:
             async with session.get(url, headers=headers) as response:
-                response_text = await response.text()
                 try:
-                    response_data = json.loads(response_text) if response_text else {}
-                except json.JSONDecodeError:
-                    logging.error("Platega check_status: failed to decode JSON: %s", response_text)
-                    return False, {"status": response.status, "message": "invalid_json", "raw": response_text}
+                    response_data = await response.json(loads=_json_loads, content_type=None) or {}
+                except (json.JSONDecodeError, ContentTypeError):
+                    raw = (await response.read())[:512].decode("utf-8", "replace")
+                    logger.error("Platega check_status: failed to decode JSON: %s", raw)
+                    return False, {"status": response.status, "message": "invalid_json", "raw": raw}
 
                 if response.status != 200:
-                    logging.error(
+                    logger.error(
                         "Platega check_status: API returned error (status=%s, body=%s)",
                         response.status,
                         response_data,
@@ -167,36 +244,184 @@ class PlategaService:
 
                 return True, response_data
         except Exception as exc:
-            logging.error("Platega check_status: request failed: %s", exc, exc_info=True)
+            logger.error("Platega check_status: request failed: %s", exc, exc_info=True)
             return False, {"message": str(exc)}
 
     async def _get_session(self) -> ClientSession:
-        if self._session is None or self._session.closed:
-            self._session = ClientSession(timeout=self._timeout)
+        session = self._session
+        if session is not None and not session.closed:
+            return session
+        # Pooled keep-alive connector: reuses TLS connections to the API host
+        # and caches DNS instead of re-resolving on every request.
+        connector = TCPConnector(
+            limit=32,
+            limit_per_host=16,
+            ttl_dns_cache=300,
+            keepalive_timeout=75,
+            enable_cleanup_closed=True,
+        )
+        self._session = ClientSession(timeout=self._timeout, connector=connector)
         return self._session
 
     async def close(self) -> None:
+        # Let in-flight webhook notifications finish before the HTTP pool goes away.
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        # The session owns its connector, so closing it releases the pool too.
         if self._session and not self._session.closed:
             await self._session.close()
 
-    def _validate_signature(self, request_headers: Dict[str, str]) -> bool:
+    def _validate_signature(self, headers: Mapping[str, str]) -> bool:
         """
         Validate webhook signature from Platega.
         Platega sends X-MerchantId and X-Secret headers.
+        Expects aiohttp's case-insensitive `request.headers`.
         """
-        merchant_id = request_headers.get("X-MerchantId") or request_headers.get("x-merchantid")
-        secret = request_headers.get("X-Secret") or request_headers.get("x-secret")
+        merchant_id = headers.get("X-MerchantId", "")
+        secret = headers.get("X-Secret", "")
 
         if not merchant_id or not secret:
             return False
 
-        if merchant_id != self.merchant_id:
-            return False
+        # Constant-time comparison; `&` keeps both checks from short-circuiting.
+        # aiohttp decodes raw header bytes with surrogateescape; round-trip them
+        # the same way so non-UTF-8 junk fails the compare instead of raising.
+        merchant_ok = hmac.compare_digest(merchant_id.encode("utf-8", "surrogateescape"), self._merchant_id_b)
+        secret_ok = hmac.compare_digest(secret.encode("utf-8", "surrogateescape"), self._secret_key_b)
+        return merchant_ok & secret_ok
 
-        if secret != self.secret_key:
-            return False
+    def _today_str(self) -> str:
+        """Current UTC date as YYYY-MM-DD, recomputed only when the day changes."""
+        day = int(time.time()) // 86400
+        if self._today_cache[0] != day:
+            self._today_cache = (day, datetime.now(timezone.utc).date().isoformat())
+        return self._today_cache[1]
 
-        return True
+    @staticmethod
+    def _date_str(value: date) -> str:
+        if isinstance(value, datetime):
+            value = value.date()
+        return value.isoformat()
+
+    def _remember_transaction(self, transaction_id: str) -> None:
+        # No awaits here, so insert + evict is atomic on the event loop.
+        self._recent_tx[transaction_id] = None
+        self._recent_tx.move_to_end(transaction_id)
+        if len(self._recent_tx) > _RECENT_TX_LIMIT:
+            self._recent_tx.popitem(last=False)
+
+    def _on_background_done(self, task: asyncio.Task) -> None:
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Platega webhook: background notification failed: %s", task.exception(), exc_info=task.exception())
+
+    async def _send_success_notifications(
+        self,
+        *,
+        transaction_id: str,
+        user_id: int,
+        payment_amount: float,
+        months: int,
+        db_user: Optional[Any],
+        inviter: Optional[Any],
+        activation: Optional[Dict[str, Any]],
+        referral_bonus: Optional[Dict[str, Any]],
+        applied_days: int,
+        payment_count: Optional[int],
+    ) -> None:
+        """Send the success message to the user and the payment log to admins."""
+        lang = db_user.language_code if db_user and db_user.language_code else self.settings.DEFAULT_LANGUAGE
+        _ = functools.partial(self.i18n.gettext, lang) if self.i18n else (lambda k, **kw: k)
+
+        config_link = None
+        final_end = None
+        if activation:
+            config_link = activation.get("subscription_url")
+            final_end = activation.get("end_date")
+
+        if referral_bonus and referral_bonus.get("referee_new_end_date"):
+            final_end = referral_bonus["referee_new_end_date"]
+
+        if not final_end and activation and activation.get("end_date"):
+            final_end = activation["end_date"]
+
+        if not config_link:
+            config_link = _("config_link_not_available")
+        if final_end:
+            end_date_str = self._date_str(final_end)
+        else:
+            end_date_str = _("config_link_not_available")
+
+        if applied_days:
+            inviter_name_display = _("friend_placeholder")
+            if inviter:
+                safe_name = sanitize_display_name(inviter.first_name) if inviter.first_name else None
+                if safe_name:
+                    inviter_name_display = safe_name
+                elif inviter.username:
+                    inviter_name_display = username_for_display(inviter.username, with_at=False)
+            text = _(
+                "payment_successful_with_referral_bonus_full",
+                months=months,
+                base_end_date=self._date_str(activation["end_date"]) if activation and activation.get("end_date") else end_date_str,
+                bonus_days=applied_days,
+                final_end_date=end_date_str,
+                inviter_name=inviter_name_display,
+                config_link=config_link,
+            )
+        else:
+            if months == 0:
+                text = _(
+                    "payment_successful_full_week",
+                    end_date=end_date_str,
+                    config_link=config_link,
+                )
+            else:
+                text = _(
+                    "payment_successful_full",
+                    months=months,
+                    end_date=end_date_str,
+                    config_link=config_link,
+                )
+
+        order_info_text = _(
+            "platega_order_full",
+            order_id=transaction_id,
+            date=self._today_str(),
+        )
+        text = f"{order_info_text}\n{text}"
+
+        markup = get_connect_and_main_keyboard(
+            lang,
+            self.i18n,
+            self.settings,
+            config_link,
+            preserve_message=True,
+        )
+        # User message and admin notification are independent Telegram calls
+        user_result, admin_result = await asyncio.gather(
+            self.bot.send_message(
+                user_id,
+                text,
+                reply_markup=markup,
+                parse_mode="HTML",
+                disable_web_page_preview=True,
+            ),
+            self._notifier.notify_payment_received(
+                user_id=user_id,
+                amount=payment_amount,
+                currency=self.default_currency,
+                months=months,
+                payment_provider="platega",
+                username=db_user.username if db_user else None,
+                payment_number=payment_count,
+            ),
+            return_exceptions=True,
+        )
+        if isinstance(user_result, Exception):
+            logger.error("Platega notification: failed to send message to user %s: %s", user_id, user_result)
+        if isinstance(admin_result, Exception):
+            logger.error("Platega notification: failed to notify admins: %s", admin_result)
 
     async def webhook_route(self, request: web.Request) -> web.Response:
         """
@@ -207,34 +432,53 @@ class PlategaService:
             return web.Response(status=503, text="platega_disabled")
 
         # Validate signature via headers
-        headers_dict = {k: v for k, v in request.headers.items()}
-        if not self._validate_signature(headers_dict):
-            logging.error("Platega webhook: invalid signature or merchant mismatch")
+        if not self._validate_signature(request.headers):
+            logger.error("Platega webhook: invalid signature or merchant mismatch")
             return web.Response(status=403, text="invalid_signature")
 
         try:
-            payload = await request.json()
+            payload = _json_loads(await request.read())
         except Exception as e:
-            logging.error(f"Platega webhook: failed to read JSON: {e}")
+            logger.error("Platega webhook: failed to read JSON: %s", e)
             return web.Response(status=400, text="bad_request")
 
-        # Log incoming webhook data for debugging
-        logging.info(f"Platega webhook received payload: {payload}")
+        # Full payload dump only at DEBUG to keep repr() off the hot path
+        logger.debug("Platega webhook received payload: %s", payload)
 
         # Platega callback format: id, amount, currency, status, paymentMethod
         transaction_id = payload.get("id")
         status = payload.get("status")
+
+        if not transaction_id or not status:
+            logger.error("Platega webhook: missing required fields. transaction_id=%s, status=%s", transaction_id, status)
+            return web.Response(status=400, text="missing_data")
+
+        # Only process CONFIRMED payments; everything else exits before any parsing or DB work
+        if status != "CONFIRMED":
+            logger.info("Platega webhook: payment %s status is %s, ignoring", transaction_id, status)
+            return web.Response(text="OK")
+
+        # Provider retry of a transaction already finalized by this process
+        if str(transaction_id) in self._recent_tx:
+            logger.info("Platega webhook: transaction %s already processed", transaction_id)
+            return web.Response(text="OK")
+
         amount_value = payload.get("amount")
-        
+
         # Try to extract payment_db_id from 'payload' field (our custom data)
         custom_payload = payload.get("payload", "")
         order_id_str = None
+        payload_verified = False
         if custom_payload:
-            # Parse "user_id:123;months:1;payment_db_id:456"
-            for part in str(custom_payload).split(";"):
-                if part.startswith("payment_db_id:"):
-                    order_id_str = part.split(":")[1]
-                    break
+            decoded = self._decode_payload(str(custom_payload))
+            if decoded is not None:
+                order_id_str = str(decoded[2])
+                payload_verified = True
+            else:
+                # Legacy format for payments created before signed tokens:
+                # "user_id:123;months:1;payment_db_id:456"
+                parts = dict(p.split(":", 1) for p in str(custom_payload).split(";") if ":" in p)
+                order_id_str = parts.get("payment_db_id")
         
         # If no custom payload, try to find payment by transaction_id
         if not order_id_str and transaction_id:
@@ -243,15 +487,6 @@ class PlategaService:
         
         amount_str = str(amount_value) if amount_value else None
 
-        if not transaction_id or not status:
-            logging.error(f"Platega webhook: missing required fields. transaction_id={transaction_id}, status={status}")
-            return web.Response(status=400, text="missing_data")
-
-        # Only process CONFIRMED payments
-        if status != "CONFIRMED":
-            logging.info(f"Platega webhook: payment {transaction_id} status is {status}, ignoring")
-            return web.Response(text="OK")
-
         async with self.async_session_factory() as session:
             payment = None
             
@@ -261,42 +496,53 @@ class PlategaService:
                     payment_db_id = int(order_id_str)
                     payment = await payment_dal.get_payment_by_db_id(session, payment_db_id)
                 except (TypeError, ValueError):
-                    logging.warning(f"Platega webhook: invalid order_id value '{order_id_str}'")
+                    logger.warning("Platega webhook: invalid order_id value '%s'", order_id_str)
             
-            # If not found, try to find by provider_payment_id (transaction_id)
-            if not payment:
+            # If not found, try to find by provider_payment_id (transaction_id).
+            # A verified token already identifies the row, so no fallback then.
+            if not payment and not payload_verified:
                 payment = await payment_dal.get_payment_by_provider_payment_id(session, str(transaction_id))
             
             if not payment:
-                logging.error(f"Platega webhook: payment not found for transaction_id={transaction_id}, order_id={order_id_str}")
+                logger.error("Platega webhook: payment not found for transaction_id=%s, order_id=%s", transaction_id, order_id_str)
                 return web.Response(status=404, text="payment_not_found")
 
             if payment.status == "succeeded":
-                logging.info(f"Platega webhook: payment {payment_db_id} already succeeded")
+                self._remember_transaction(str(transaction_id))
+                logger.info("Platega webhook: payment %s already succeeded", payment.payment_id)
                 return web.Response(text="OK")
 
             # Optional amount verification
             if amount_str:
                 try:
-                    amount_decimal = Decimal(amount_str)
-                    expected_amount = Decimal(str(payment.amount)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-                    if amount_decimal.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) != expected_amount:
-                        logging.warning(
-                            f"Platega webhook: amount mismatch for payment {payment_db_id} "
-                            f"(expected {expected_amount}, got {amount_decimal})"
+                    expected_cents = self._to_cents(payment.amount)
+                    got_cents = self._to_cents(amount_str)
+                    if expected_cents != got_cents:
+                        logger.warning(
+                            "Platega webhook: amount mismatch for payment %s (expected %s, got %s)",
+                            payment.payment_id,
+                            self._format_amount(payment.amount),
+                            amount_str,
                         )
                 except Exception as e:
-                    logging.warning(f"Platega webhook: failed to compare amount for payment {payment_db_id}: {e}")
+                    logger.warning("Platega webhook: failed to compare amount for payment %s: %s", payment.payment_id, e)
 
             activation = None
             referral_bonus = None
             try:
-                await payment_dal.update_provider_payment_and_status(
+                updated_rows = await payment_dal.update_provider_payment_and_status_if_not(
                     session=session,
                     payment_db_id=payment.payment_id,
                     provider_payment_id=str(transaction_id),
                     new_status="succeeded",
+                    expected_prev_status_not="succeeded",
                 )
+                if updated_rows == 0:
+                    # A concurrent delivery of this webhook finalized the payment first
+                    await session.commit()
+                    self._remember_transaction(str(transaction_id))
+                    logger.info("Platega webhook: payment %s already finalized concurrently", payment.payment_id)
+                    return web.Response(text="OK")
 
                 months = payment.subscription_duration_months if payment.subscription_duration_months is not None else 1
 
@@ -320,109 +566,47 @@ class PlategaService:
                 await session.commit()
             except Exception as e:
                 await session.rollback()
-                logging.error(f"Platega webhook: failed to process payment {payment_db_id}: {e}", exc_info=True)
+                logger.error("Platega webhook: failed to process payment %s: %s", payment.payment_id, e, exc_info=True)
                 return web.Response(status=500, text="processing_error")
 
-            db_user = payment.user or await user_dal.get_user_by_id(session, payment.user_id)
-            lang = db_user.language_code if db_user and db_user.language_code else self.settings.DEFAULT_LANGUAGE
-            _ = lambda k, **kw: self.i18n.gettext(lang, k, **kw) if self.i18n else k
+            self._remember_transaction(str(transaction_id))
 
-            config_link = None
-            final_end = None
-            months = payment.subscription_duration_months if payment.subscription_duration_months is not None else 1
-            if activation:
-                config_link = activation.get("subscription_url")
-                final_end = activation.get("end_date")
+            db_user = payment.user or await user_dal.get_user_by_id(session, payment.user_id)
 
             applied_days = 0
             if referral_bonus and referral_bonus.get("referee_new_end_date"):
-                final_end = referral_bonus["referee_new_end_date"]
                 applied_days = referral_bonus.get("referee_bonus_applied_days", 0)
 
-            if not final_end and activation and activation.get("end_date"):
-                final_end = activation["end_date"]
-
-            if not config_link:
-                config_link = _("config_link_not_available")
-            if final_end:
-                end_date_str = final_end.strftime("%Y-%m-%d")
-            else:
-                end_date_str = _("config_link_not_available")
-
-            if applied_days:
-                inviter_name_display = _("friend_placeholder")
-                if db_user and db_user.referred_by_id:
-                    inviter = await user_dal.get_user_by_id(session, db_user.referred_by_id)
-                    if inviter:
-                        safe_name = sanitize_display_name(inviter.first_name) if inviter.first_name else None
-                        if safe_name:
-                            inviter_name_display = safe_name
-                        elif inviter.username:
-                            inviter_name_display = username_for_display(inviter.username, with_at=False)
-                text = _(
-                    "payment_successful_with_referral_bonus_full",
-                    months=months,
-                    base_end_date=activation["end_date"].strftime("%Y-%m-%d") if activation and activation.get("end_date") else end_date_str,
-                    bonus_days=applied_days,
-                    final_end_date=end_date_str,
-                    inviter_name=inviter_name_display,
-                    config_link=config_link,
-                )
-            else:
-                if months == 0:
-                    text = _(
-                        "payment_successful_full_week",
-                        end_date=end_date_str,
-                        config_link=config_link,
-                    )
-                else:
-                    text = _(
-                        "payment_successful_full",
-                        months=months,
-                        end_date=end_date_str,
-                        config_link=config_link,
-                    )
-
-            order_info_text = _(
-                "platega_order_full",
-                order_id=transaction_id,
-                date=datetime.now().strftime("%Y-%m-%d"),
-            )
-            text = f"{order_info_text}\n{text}"
-
-            markup = get_connect_and_main_keyboard(
-                lang,
-                self.i18n,
-                self.settings,
-                config_link,
-                preserve_message=True,
-            )
-            try:
-                await self.bot.send_message(
-                    payment.user_id,
-                    text,
-                    reply_markup=markup,
-                    parse_mode="HTML",
-                    disable_web_page_preview=True,
-                )
-            except Exception as e:
-                logging.error(f"Platega notification: failed to send message to user {payment.user_id}: {e}")
+            inviter = None
+            if applied_days and db_user and db_user.referred_by_id:
+                inviter = await user_dal.get_user_by_id(session, db_user.referred_by_id)
 
+            payment_count: Optional[int] = None
             try:
-                notification_service = NotificationService(self.bot, self.settings, self.i18n)
                 # Count user's succeeded payments (including this one)
                 payment_count = await payment_dal.count_user_succeeded_payments(session, payment.user_id)
-                await notification_service.notify_payment_received(
-                    user_id=payment.user_id,
-                    amount=float(payment.amount),
-                    currency=self.default_currency,
-                    months=months,
-                    payment_provider="platega",
-                    username=db_user.username if db_user else None,
-                    payment_number=payment_count,
-                )
             except Exception as e:
-                logging.error(f"Platega notification: failed to notify admins: {e}")
+                logger.error("Platega webhook: failed to count payments for user %s: %s", payment.user_id, e)
+
+        # The payment is committed at this point; notifying the user and admins
+        # (Telegram round-trips) runs in the background so the provider gets
+        # its acknowledgement without waiting on them.
+        task = asyncio.create_task(
+            self._send_success_notifications(
+                transaction_id=str(transaction_id),
+                user_id=payment.user_id,
+                payment_amount=float(payment.amount),
+                months=payment.subscription_duration_months if payment.subscription_duration_months is not None else 1,
+                db_user=db_user,
+                inviter=inviter,
+                activation=activation,
+                referral_bonus=referral_bonus,
+                applied_days=applied_days,
+                payment_count=payment_count,
+            )
+        )
+        self._pending.add(task)
+        task.add_done_callback(self._on_background_done)
 
         return web.Response(text="OK")
 
@@ -155,6 +155,39 @@ async def count_user_succeeded_payments(
     return result.scalar() or 0
 
 
+async def update_provider_payment_and_status_if_not(
+        session: AsyncSession, payment_db_id: int,
+        provider_payment_id: str, new_status: str,
+        expected_prev_status_not: str) -> int:
+    """Set provider id and status unless the payment is already in expected_prev_status_not.
+
+    Runs as a single conditional UPDATE and returns the number of rows changed,
+    so concurrent webhooks for the same payment cannot both finalize it.
+    """
+    stmt = (
+        update(Payment)
+        .where(
+            Payment.payment_id == payment_db_id,
+            Payment.status != expected_prev_status_not,
+        )
+        .values(
+            status=new_status,
+            provider_payment_id=provider_payment_id,
+            updated_at=func.now(),
+        )
+    )
+    result = await session.execute(stmt)
+    if result.rowcount:
+        logging.info(
+            f"Payment record {payment_db_id} updated with provider id {provider_payment_id} and status {new_status}."
+        )
+    else:
+        logging.info(
+            f"Payment record {payment_db_id} not updated: missing or already '{expected_prev_status_not}'."
+        )
+    return result.rowcount
+
+
 async def update_provider_payment_and_status(
         session: AsyncSession, payment_db_id: int,
         provider_payment_id: str, new_status: str) -> Optional[Payment]: